@@ -3,10 +3,10 @@
 
 a = Analysis(
     ['app/main.py'],
-    pathex=[],
+    pathex=['app'],
     binaries=[],
     datas=[('app/static', 'static')],
-    hiddenimports=[],
+    hiddenimports=['requests', 'fura_client', 'auth_cache', 'crawl_jobs', 'knowledge_cache'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
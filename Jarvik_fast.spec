@@ -0,0 +1,47 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Cold-start profile: one-folder build (no unpacking to a temp dir on every
+# launch), no UPX decompression, and fast-start mode enabled by a runtime hook.
+# Build with `pyinstaller Jarvik_fast.spec`; the app is in dist/Jarvik/.
+
+
+a = Analysis(
+    ['app/main.py'],
+    pathex=['app'],
+    binaries=[],
+    datas=[('app/static', 'static')],
+    hiddenimports=['requests', 'fura_client', 'auth_cache', 'crawl_jobs', 'knowledge_cache'],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=['packaging/rth_fast_start.py'],
+    excludes=['tkinter'],
+    noarchive=False,
+    optimize=1,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='Jarvik',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='Jarvik',
+)
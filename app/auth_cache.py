@@ -0,0 +1,121 @@
+import hashlib
+import secrets
+import threading
+import time
+
+import fura_session
+
+AUTH_TTL = 60 * 5  # 5 minutes
+AUTH_NEGATIVE_TTL = 30
+NEGATIVE_STATUSES = (401, 403)
+SESSION_TTL = 60 * 60 * 12  # 12 hours
+
+_verified = {}
+_sessions = {}  # token hash -> credentials; never written to disk
+_lock = threading.Lock()
+
+
+def credential_key(api_url, username, api_key):
+    """Hash credentials so raw API keys are never used as dictionary keys."""
+    raw = "\0".join([api_url or "", username or "", api_key or ""])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def verify(api_url, username, api_key):
+    """Return ``(status_code, data)`` from ``/auth/me``, cached per credentials.
+
+    Successful checks are cached for ``AUTH_TTL`` seconds and rejected
+    credentials for ``AUTH_NEGATIVE_TTL`` seconds. Network errors are not
+    cached and propagate as ``requests.RequestException``.
+    """
+    key = credential_key(api_url, username, api_key)
+    now = time.time()
+    with _lock:
+        cached = _verified.get(key)
+        if cached and cached["expires"] > now:
+            return cached["status"], cached["data"]
+
+    headers = {"Authorization": f"Bearer {api_key}"}
+    params = {"user": username}
+    res = fura_session.get(api_url, "/auth/me", headers=headers, params=params, timeout=10)
+    try:
+        data = res.json()
+    except ValueError:
+        data = {"error": "Invalid JSON response", "details": res.text}
+
+    if res.ok:
+        ttl = AUTH_TTL
+    elif res.status_code in NEGATIVE_STATUSES:
+        ttl = AUTH_NEGATIVE_TTL
+    else:
+        ttl = 0
+    if ttl:
+        with _lock:
+            _prune_verified(now)
+            _verified[key] = {"expires": now + ttl, "status": res.status_code, "data": data}
+    return res.status_code, data
+
+
+def invalidate(api_url, username, api_key):
+    """Drop the cached verification result for the given credentials."""
+    with _lock:
+        _verified.pop(credential_key(api_url, username, api_key), None)
+
+
+def _token_key(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_token(api_url, username, api_key):
+    """Create a session token standing in for already verified credentials.
+
+    Sessions live only in this process: the API key they carry is never
+    written to disk, at the cost of users logging in again after a restart.
+    """
+    token = secrets.token_urlsafe(32)
+    now = time.time()
+    with _lock:
+        _prune_sessions(now)
+        _sessions[_token_key(token)] = {
+            "api_url": api_url,
+            "username": username,
+            "api_key": api_key,
+            "expires": now + SESSION_TTL,
+        }
+    return token
+
+
+def resolve_token(token):
+    """Return the credentials for ``token`` or ``None`` if unknown or expired."""
+    if not token:
+        return None
+    key = _token_key(token)
+    with _lock:
+        session = _sessions.get(key)
+        if not session:
+            return None
+        if session["expires"] <= time.time():
+            del _sessions[key]
+            return None
+        return {
+            "api_url": session["api_url"],
+            "username": session["username"],
+            "api_key": session["api_key"],
+        }
+
+
+def revoke_token(token):
+    with _lock:
+        _sessions.pop(_token_key(token), None)
+
+
+def _prune_sessions(now):
+    expired = [key for key, session in _sessions.items() if session["expires"] <= now]
+    for key in expired:
+        del _sessions[key]
+
+
+def _prune_verified(now):
+    expired = [key for key, entry in _verified.items() if entry["expires"] <= now]
+    for key in expired:
+        del _verified[key]
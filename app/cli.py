@@ -14,14 +14,14 @@ class JarvikCLI(cmd.Cmd):
         super().__init__()
         self.api_url = ""
         self.username = ""
-        self.api_key = ""
+        self.session_token = ""
         self.model = ""
         self.memory = "private"
         self.models = []
 
     # --- helper methods -------------------------------------------------
     def _require_login(self):
-        if not self.api_key or not self.username:
+        if not self.session_token:
             print("Please login first (login <api_url> <username> <api_key>)")
             return False
         return True
@@ -58,15 +58,36 @@ class JarvikCLI(cmd.Cmd):
         if len(parts) < 3:
             print("Usage: login <api_url> <username> <api_key>")
             return
-        self.api_url, self.username, self.api_key = parts[:3]
+        api_url, username, api_key = parts[:3]
+        payload = {"api_url": api_url, "username": username, "api_key": api_key}
+        try:
+            res = requests.post(f"{BASE_URL}/auth/me", json=payload, timeout=15)
+            data = res.json()
+        except Exception as e:
+            print("Login failed:", e)
+            return
+        if not res.ok or not data.get("session_token"):
+            print("Login failed:", data.get("error", res.text))
+            return
+        self.api_url, self.username = api_url, username
+        self.session_token = data["session_token"]
         print(f"Logged in as {self.username}")
         self._fetch_models()
 
     def do_logout(self, line):
         """Clear stored credentials"""
+        if self.session_token:
+            try:
+                requests.post(
+                    f"{BASE_URL}/auth/logout",
+                    json={"session_token": self.session_token},
+                    timeout=10,
+                )
+            except Exception:
+                pass
         self.api_url = ""
         self.username = ""
-        self.api_key = ""
+        self.session_token = ""
         print("Logged out")
 
     def do_models(self, line):
@@ -107,9 +128,7 @@ class JarvikCLI(cmd.Cmd):
             return
         payload = {
             "message": message,
-            "api_url": self.api_url or None,
-            "username": self.username,
-            "api_key": self.api_key,
+            "session_token": self.session_token,
             "model": self.model or None,
             "remember": self.memory == "public",
         }
@@ -169,12 +188,8 @@ class JarvikCLI(cmd.Cmd):
                 except OSError as e:
                     raise RuntimeError(f"Cannot read {path}: {e}") from e
                 yield '"'
-            yield '},"api_url":'
-            yield json.dumps(self.api_url or None)
-            yield ',"username":'
-            yield json.dumps(self.username)
-            yield ',"api_key":'
-            yield json.dumps(self.api_key)
+            yield '},"session_token":'
+            yield json.dumps(self.session_token)
             yield ',"model":'
             yield json.dumps(self.model or None)
             yield ',"remember":'
@@ -0,0 +1,163 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import auth_cache
+import fura_session
+
+CRAWL_WORKERS = 4
+CRAWL_TIMEOUT = 120
+MAX_PENDING_JOBS = 256
+DEDUP_WINDOW = 60 * 10  # 10 minutes
+JOB_RETENTION = 60 * 60  # 1 hour
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_jobs = {}
+_by_url = {}
+_lock = threading.Lock()
+_executor = None
+
+
+class QueueFullError(Exception):
+    """Raised when too many crawl jobs are waiting to run."""
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=CRAWL_WORKERS, thread_name_prefix="crawl")
+    return _executor
+
+
+def _public(job):
+    return {k: v for k, v in job.items() if not k.startswith("_")}
+
+
+def _prune(now):
+    stale = [
+        job_id
+        for job_id, job in _jobs.items()
+        if job["status"] in (DONE, FAILED) and now - job["finished"] > JOB_RETENTION
+    ]
+    for job_id in stale:
+        job = _jobs.pop(job_id)
+        if _by_url.get(job["_dedup_key"]) == job_id:
+            del _by_url[job["_dedup_key"]]
+
+
+def _pending_count():
+    return sum(1 for job in _jobs.values() if job["status"] in (QUEUED, RUNNING))
+
+
+def submit(url, api_url, username, api_key):
+    """Enqueue a crawl of ``url`` and return the job as a dict.
+
+    A job for the same URL and user submitted within ``DEDUP_WINDOW`` seconds
+    with the same credentials is returned instead of starting a new one,
+    unless that job failed.
+    """
+    now = time.time()
+    owner = auth_cache.credential_key(api_url, username, api_key)
+    dedup_key = (owner, url.strip())
+    with _lock:
+        _prune(now)
+        existing = _jobs.get(_by_url.get(dedup_key))
+        if (
+            existing
+            and existing["status"] != FAILED
+            and now - existing["created"] < DEDUP_WINDOW
+        ):
+            return _public(existing)
+        if _pending_count() >= MAX_PENDING_JOBS:
+            raise QueueFullError("Too many pending crawl jobs")
+        job = {
+            "id": uuid.uuid4().hex,
+            "url": url.strip(),
+            "status": QUEUED,
+            "created": now,
+            "finished": None,
+            "result": None,
+            "error": None,
+            "_dedup_key": dedup_key,
+            "_owner": owner,
+            "_credentials": (api_url, username, api_key),
+        }
+        _jobs[job["id"]] = job
+        _by_url[dedup_key] = job["id"]
+        public = _public(job)
+    _get_executor().submit(_run, job["id"])
+    return public
+
+
+def submit_many(urls, api_url, username, api_key):
+    """Enqueue several URLs, skipping blanks and duplicates within the list.
+
+    Returns ``(jobs, rejected)`` where ``rejected`` lists the URLs that did
+    not fit into the queue; jobs accepted before the queue filled keep running.
+    """
+    jobs = []
+    rejected = []
+    seen = set()
+    for url in urls:
+        if not isinstance(url, str) or not url.strip() or url.strip() in seen:
+            continue
+        seen.add(url.strip())
+        try:
+            jobs.append(submit(url, api_url, username, api_key))
+        except QueueFullError:
+            rejected.append(url.strip())
+    return jobs, rejected
+
+
+def get_job(job_id, api_url, username, api_key):
+    """Return the public view of a job, or ``None`` if it is unknown or was
+    submitted with other credentials."""
+    owner = auth_cache.credential_key(api_url, username, api_key)
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None or job["_owner"] != owner:
+            return None
+        return _public(job)
+
+
+def _run(job_id):
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return
+        job["status"] = RUNNING
+        api_url, username, api_key = job["_credentials"]
+        url = job["url"]
+
+    headers = {"Authorization": f"Bearer {api_key}"}
+    payload = {"url": url, "user": username}
+    status, result, error = FAILED, None, None
+    try:
+        res = fura_session.post(
+            api_url,
+            "/crawl",
+            json=payload,
+            headers=headers,
+            timeout=CRAWL_TIMEOUT,
+        )
+        res.raise_for_status()
+        result = res.json()
+        status = DONE
+    except requests.RequestException as exc:
+        error = str(exc)
+    except ValueError:
+        error = "Invalid JSON response"
+
+    with _lock:
+        job["status"] = status
+        job["result"] = result
+        job["error"] = error
+        job["finished"] = time.time()
+        job["_credentials"] = None
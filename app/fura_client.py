@@ -1,63 +1,392 @@
 import os
 import time
+import json
 import shelve
-import heapq
+import struct
+import zlib
+import hashlib
+import threading
 
 import requests
 
+import auth_cache
+import fura_session
+import local_index
+from near_duplicates import NearDuplicateIndex
+from text_utils import canonicalize_query, is_wording_variant
+
 API_URL = "https://fura.jarvik-ai.tech"
 CACHE_FILE = os.path.join(os.path.dirname(__file__), "context_cache.db")
-CACHE_TTL = 60 * 60 * 24  # 24 hours
+CACHE_TTL = 60 * 60 * 24  # 24 hours; how long entries may serve as a fallback
+SERVE_TTL = 60 * 5  # 5 minutes; how long an exact hit is answered without Fura
 CACHE_MAX_ITEMS = 128
+CACHE_MAX_BYTES = 16 * 1024 * 1024  # compressed payload bytes
+SKETCH_WIDTH = 4096
+SKETCH_DEPTH = 4
+SKETCH_MAX_COUNT = 15
+NEAR_DUPLICATE_THRESHOLD = 0.8  # shingle Jaccard similarity; None disables
+LOCAL_MERGE_RESULTS = False  # append local index hits to remote context
+SERVE_CACHED_CONTEXT = True  # answer exact hits younger than SERVE_TTL without calling Fura
+
+
+class FrequencySketch:
+    """Count-min sketch with periodic halving, used for TinyLFU admission."""
+
+    def __init__(self, width=SKETCH_WIDTH, depth=SKETCH_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.sample_size = 10 * width
+        self.additions = 0
+        self.rows = [[0] * width for _ in range(depth)]
+
+    def _indexes(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=4 * self.depth).digest()
+        return [h % self.width for h in struct.unpack(f"<{self.depth}I", digest)]
+
+    def increment(self, key):
+        for row, idx in zip(self.rows, self._indexes(key)):
+            if row[idx] < SKETCH_MAX_COUNT:
+                row[idx] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self._age()
+
+    def estimate(self, key):
+        return min(row[idx] for row, idx in zip(self.rows, self._indexes(key)))
+
+    def _age(self):
+        for row in self.rows:
+            for i, count in enumerate(row):
+                row[i] = count >> 1
+        self.additions //= 2
+
+
+_sketch = FrequencySketch()
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "fallbacks": 0,
+    "local_fallbacks": 0,
+    "evictions": 0,
+    "rejections": 0,
+}
+_indexes = None  # partition -> NearDuplicateIndex, built lazily from cache keys
+_meta = {}
+_meta_bytes = 0
+_meta_file = None
+_lock = threading.Lock()  # guards the shelve and all cache state above
 
 
 def _open_cache():
     return shelve.open(CACHE_FILE)
 
 
+def _entry_size(entry):
+    return entry.get("size", 0)
+
+
+def _last_access(entry):
+    return entry.get("last_access", entry.get("timestamp", 0))
+
+
+def _pack(data, now):
+    payload = zlib.compress(json.dumps(data).encode("utf-8"))
+    return {"timestamp": now, "last_access": now, "payload": payload, "size": len(payload)}
+
+
+def _unpack(entry):
+    if "payload" in entry:
+        return json.loads(zlib.decompress(entry["payload"]).decode("utf-8"))
+    return entry.get("data")
+
+
+def _get_meta(cache):
+    """Return ``{key: [size, last_access]}`` for the open cache.
+
+    The index is built from the shelve once per cache file, after which
+    pruning, admission and stats never unpickle stored payloads.
+    """
+    global _meta, _meta_bytes, _meta_file
+    if _meta_file != CACHE_FILE:
+        _meta = {key: [_entry_size(entry), _last_access(entry)] for key, entry in cache.items()}
+        _meta_bytes = sum(size for size, _ in _meta.values())
+        _meta_file = CACHE_FILE
+    return _meta
+
+
+def _meta_set(key, size, last_access):
+    global _meta_bytes
+    old = _meta.get(key)
+    if old:
+        _meta_bytes -= old[0]
+    _meta[key] = [size, last_access]
+    _meta_bytes += size
+
+
+def _meta_del(key):
+    global _meta_bytes
+    old = _meta.pop(key, None)
+    if old:
+        _meta_bytes -= old[0]
+
+
+def _touch(cache, key, now):
+    meta = _get_meta(cache)
+    if key in meta:
+        meta[key][1] = now
+
+
 def _prune_cache(cache):
-    """Remove oldest items from cache when exceeding max items."""
-    excess = len(cache) - CACHE_MAX_ITEMS
-    if excess <= 0:
+    """Evict least recently used items until the item and byte budgets hold."""
+    meta = _get_meta(cache)
+    if len(meta) <= CACHE_MAX_ITEMS and _meta_bytes <= CACHE_MAX_BYTES:
         return
-    oldest = heapq.nsmallest(
-        excess,
-        cache.items(),
-        key=lambda item: item[1].get("timestamp", 0),
+    by_age = sorted(meta, key=lambda key: meta[key][1])
+    for key in by_age:
+        if len(meta) <= CACHE_MAX_ITEMS and _meta_bytes <= CACHE_MAX_BYTES:
+            break
+        if key in cache:
+            del cache[key]
+        _meta_del(key)
+        _index_remove(key)
+        _stats["evictions"] += 1
+
+
+def _admit(cache, key, size):
+    """TinyLFU admission: a new key must be used more often than the LRU victim."""
+    if size > CACHE_MAX_BYTES:
+        return False
+    meta = _get_meta(cache)
+    if len(meta) < CACHE_MAX_ITEMS and _meta_bytes + size <= CACHE_MAX_BYTES:
+        return True
+    victim = min(meta, key=lambda k: meta[k][1], default=None)
+    if victim is None:
+        return True
+    return _sketch.estimate(key) > _sketch.estimate(victim)
+
+
+def _store(cache, key, data, now):
+    entry = _pack(data, now)
+    if key not in _get_meta(cache) and not _admit(cache, key, entry["size"]):
+        _stats["rejections"] += 1
+        return False
+    cache[key] = entry
+    _meta_set(key, entry["size"], now)
+    _index_add(key)
+    _prune_cache(cache)
+    return True
+
+
+def cache_key(query, api_url, username, api_key, remember):
+    """Return the shelve key: credential partition, memory mode and canonical query.
+
+    The partition keeps private contexts of one user (and API key) from
+    being served to another, also through near-duplicate matching.
+    """
+    partition = _partition(api_url, username, api_key, remember)
+    return f"{partition}\0{canonicalize_query(query) or query}"
+
+
+def _partition(api_url, username, api_key, remember):
+    mode = "public" if remember else "private"
+    return f"{auth_cache.credential_key(api_url, username, api_key)}:{mode}"
+
+
+def _split_key(key):
+    partition, sep, query = key.partition("\0")
+    return (partition, query) if sep else (None, key)
+
+
+def _index_add(key):
+    partition, query = _split_key(key)
+    if _indexes is not None and partition is not None:
+        _indexes.setdefault(partition, NearDuplicateIndex(NEAR_DUPLICATE_THRESHOLD)).add(query)
+
+
+def _index_remove(key):
+    partition, query = _split_key(key)
+    index = _indexes.get(partition) if _indexes is not None else None
+    if index is not None:
+        index.remove(query)
+
+
+def _get_index(cache, partition):
+    """Return the partition's near-duplicate index, building all of them on first use."""
+    global _indexes
+    if _indexes is None:
+        _indexes = {}
+        for key in cache.keys():
+            part, query = _split_key(key)
+            if part is not None:
+                _indexes.setdefault(part, NearDuplicateIndex(NEAR_DUPLICATE_THRESHOLD)).add(query)
+    index = _indexes.setdefault(partition, NearDuplicateIndex(NEAR_DUPLICATE_THRESHOLD))
+    index.threshold = NEAR_DUPLICATE_THRESHOLD
+    return index
+
+
+def _is_fresh(entry, now):
+    return now - entry.get("timestamp", 0) < CACHE_TTL
+
+
+def _lookup(cache, key, now):
+    """Return ``(cache_key, entry)`` for the best exact or near-duplicate match.
+
+    A fresh entry wins over a stale one; stale entries are still returned so
+    they can serve as a fallback when Fura is unreachable. Near duplicates
+    must be wording variants of the query (see ``is_wording_variant``).
+    """
+    exact = cache.get(key)
+    if exact and _is_fresh(exact, now):
+        return key, exact
+    near_key, near = None, None
+    if NEAR_DUPLICATE_THRESHOLD is not None:
+        partition, query = _split_key(key)
+        index = _get_index(cache, partition)
+        match, _ = index.lookup(query)
+        if match is not None and match != query and is_wording_variant(query, match):
+            near_key = f"{partition}\0{match}"
+            near = cache.get(near_key)
+            if near is None:
+                index.remove(match)
+                near_key = None
+    if near is not None and _is_fresh(near, now):
+        return near_key, near
+    if exact:
+        return key, exact
+    return near_key, near
+
+
+def _servable(cached_key, cached, key, remember, now):
+    """Only a recent exact hit may replace a call to Fura.
+
+    Near duplicates can still differ in meaning and ``remember`` requests
+    must reach Fura to be stored, so both are used only as a fallback.
+    """
+    return (
+        SERVE_CACHED_CONTEXT
+        and not remember
+        and cached is not None
+        and cached_key == key
+        and now - cached.get("timestamp", 0) < SERVE_TTL
     )
-    for key, _ in oldest:
-        del cache[key]
+
+
+def cache_stats():
+    """Return hit ratio, byte usage and eviction counters for the context cache.
+
+    ``hits`` count requests answered from the cache without calling Fura;
+    ``fallbacks`` count cached exact or near-duplicate answers used because
+    Fura failed.
+    """
+    with _lock, _open_cache() as cache:
+        items = len(_get_meta(cache))
+        total_bytes = _meta_bytes
+        stats = dict(_stats)
+    hits = stats["hits"]
+    lookups = hits + stats["misses"]
+    return {
+        **stats,
+        "items": items,
+        "bytes": total_bytes,
+        "max_items": CACHE_MAX_ITEMS,
+        "max_bytes": CACHE_MAX_BYTES,
+        "hit_ratio": hits / lookups if lookups else 0.0,
+    }
 
 
 def get_context(query, api_key, username, api_url: str = API_URL, remember: bool = False):
     now = time.time()
     headers = {"Authorization": f"Bearer {api_key}"}
     data = {"query": query, "user": username, "remember": remember}
+    key = cache_key(query, api_url, username, api_key, remember)
 
-    with _open_cache() as cache:
-        cached = cache.get(query)
-        if cached and now - cached.get("timestamp", 0) < CACHE_TTL:
-            cached_data = cached.get("data")
-        else:
-            cached_data = None
-
-        try:
-            res = requests.post(
-                f"{api_url}/get_context",
-                json=data,
-                headers=headers,
-                timeout=10,
-            )
-            res.raise_for_status()
-            result = res.json()
-            cache[query] = {"timestamp": now, "data": result}
-            _prune_cache(cache)
-            cache.sync()
-            return result
-        except requests.RequestException as exc:
-            if cached_data is not None:
-                return cached_data
+    with _lock, _open_cache() as cache:
+        _sketch.increment(key)
+        cached_key, cached = _lookup(cache, key, now)
+        if _servable(cached_key, cached, key, remember, now):
+            _stats["hits"] += 1
+            _touch(cache, cached_key, now)
+            return _unpack(cached)
+        _stats["misses"] += 1
+
+    # The lock is not held across the network call so one slow request does
+    # not stall every other thread's cache hits.
+    try:
+        res = fura_session.post(
+            api_url,
+            "/get_context",
+            json=data,
+            headers=headers,
+            timeout=10,
+        )
+        res.raise_for_status()
+        result = res.json()
+    except requests.RequestException as exc:
+        if not _is_outage(exc):
             return {"error": "API request failed", "details": str(exc)}
-        except ValueError:
-            return {"error": "Invalid JSON response", "details": res.text}
+        if cached is not None:
+            with _lock, _open_cache() as cache:
+                _stats["fallbacks"] += 1
+                _touch(cache, cached_key, now)
+            return _unpack(cached)
+        local = local_index.build_context(query, api_url, username, api_key, remember)
+        if local is not None:
+            with _lock:
+                _stats["local_fallbacks"] += 1
+            return local
+        return {"error": "API request failed", "details": str(exc)}
+    except ValueError:
+        return {"error": "Invalid JSON response", "details": res.text}
+
+    with _lock, _open_cache() as cache:
+        _store(cache, key, result, now)
+        cache.sync()
+
+    items = _debug_items(result)
+    local_index.add_items(api_url, username, api_key, remember, items)
+    if LOCAL_MERGE_RESULTS:
+        result = _merge_local(result, items, query, api_url, username, api_key, remember)
+    return result
+
+
+def _is_outage(exc):
+    """Only connection failures, timeouts and 5xx responses allow a fallback.
+
+    Other errors such as 401/403 mean the credentials were rejected, so no
+    cached or local context may be returned for them.
+    """
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(exc, "response", None)
+    return (
+        isinstance(exc, requests.HTTPError)
+        and response is not None
+        and response.status_code >= 500
+    )
+
+
+def _debug_items(result):
+    debug = result.get("debug") if isinstance(result, dict) else None
+    if isinstance(debug, dict) and isinstance(debug.get("items"), list):
+        return debug["items"]
+    return []
+
 
+def _merge_local(result, items, query, api_url, username, api_key, remember):
+    """Append local index hits that the remote response did not already include."""
+    seen = {local_index.item_text(item) for item in items}
+    extra = [
+        item
+        for _, item in local_index.search(api_url, username, api_key, remember, query)
+        if local_index.item_text(item) not in seen
+    ]
+    if not extra or not isinstance(result, dict):
+        return result
+    merged = dict(result)
+    texts = [merged.get("context") or ""] + [local_index.item_text(item) for item in extra]
+    merged["context"] = "\n".join(text for text in texts if text)
+    debug = dict(merged.get("debug") or {})
+    debug["items"] = list(items) + extra
+    debug["local_items_count"] = len(extra)
+    merged["debug"] = debug
+    return merged
@@ -0,0 +1,105 @@
+import gzip
+import json
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_SIZE = int(os.environ.get("FURA_POOL_SIZE", "10"))
+MAX_RETRIES = int(os.environ.get("FURA_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.environ.get("FURA_BACKOFF_FACTOR", "0.3"))
+RETRY_STATUSES = (502, 503, 504)
+GZIP_REQUESTS = os.environ.get("FURA_GZIP_REQUESTS", "").lower() in {"1", "true", "yes"}
+GZIP_MIN_BYTES = 1024
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _normalize_url(api_url):
+    return (api_url or "").rstrip("/")
+
+
+def _build_retry(idempotent):
+    """Retry policy for a session.
+
+    urllib3 applies connect retries to every method regardless of
+    ``allowed_methods``, so non-idempotent calls get no retries at all;
+    otherwise a blackholed host would multiply the POST timeout.
+    """
+    if not idempotent:
+        return Retry(total=0, connect=0, read=0, status=0, raise_on_status=False)
+    return Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        raise_on_status=False,
+    )
+
+
+def _build_session(idempotent=True):
+    """Create a keep-alive session with a sized pool and its retry policy."""
+    retry = _build_retry(idempotent)
+    adapter = HTTPAdapter(
+        pool_connections=POOL_SIZE,
+        pool_maxsize=POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate"})
+    return session
+
+
+def get_session(api_url, idempotent=True):
+    """Return the shared session for ``api_url``, creating it on first use.
+
+    Idempotent (GET) and non-idempotent (POST) calls use separate pools so
+    each can carry its own retry policy.
+    """
+    key = (_normalize_url(api_url), idempotent)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _build_session(idempotent)
+            _sessions[key] = session
+        return session
+
+
+def close_sessions():
+    """Close and forget all pooled sessions."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def _encode_json(payload, headers, compress):
+    body = json.dumps(payload).encode("utf-8")
+    headers["Content-Type"] = "application/json"
+    if compress and len(body) >= GZIP_MIN_BYTES:
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    return body
+
+
+def get(api_url, path, **kwargs):
+    """GET ``{api_url}{path}`` through the pooled session."""
+    return get_session(api_url).get(f"{_normalize_url(api_url)}{path}", **kwargs)
+
+
+def post(api_url, path, json=None, headers=None, gzip_body=None, **kwargs):
+    """POST ``json`` to ``{api_url}{path}``, gzip-compressing large bodies if enabled."""
+    headers = dict(headers or {})
+    compress = GZIP_REQUESTS if gzip_body is None else gzip_body
+    data = _encode_json(json, headers, compress)
+    return get_session(api_url, idempotent=False).post(
+        f"{_normalize_url(api_url)}{path}",
+        data=data,
+        headers=headers,
+        **kwargs,
+    )
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import auth_cache
+import fura_session
+
+KNOWLEDGE_TTL = 60 * 5  # 5 minutes
+KNOWLEDGE_MAX_BYTES = 8 * 1024 * 1024
+PREFETCH_WORKERS = 2
+
+HIT = "HIT"
+MISS = "MISS"
+REVALIDATED = "REVALIDATED"
+
+_entries = OrderedDict()
+_total_bytes = 0
+_lock = threading.Lock()
+_prefetcher = None
+
+
+def _cache_key(api_url, username, api_key, query, page):
+    # The credential hash keeps a wrong key from reading another user's results.
+    return (auth_cache.credential_key(api_url, username, api_key), query, page)
+
+
+def _content_hash(body):
+    return '"' + hashlib.sha256(body).hexdigest() + '"'
+
+
+def _store(key, data, etag, size):
+    global _total_bytes
+    with _lock:
+        old = _entries.pop(key, None)
+        if old:
+            _total_bytes -= old["size"]
+        if size > KNOWLEDGE_MAX_BYTES:
+            return
+        _entries[key] = {"data": data, "etag": etag, "size": size, "fetched": time.time()}
+        _total_bytes += size
+        while _total_bytes > KNOWLEDGE_MAX_BYTES:
+            _, evicted = _entries.popitem(last=False)
+            _total_bytes -= evicted["size"]
+
+
+def _lookup(key):
+    with _lock:
+        entry = _entries.get(key)
+        if entry:
+            _entries.move_to_end(key)
+        return entry
+
+
+def _touch(key):
+    with _lock:
+        entry = _entries.get(key)
+        if entry:
+            entry["fetched"] = time.time()
+            _entries.move_to_end(key)
+
+
+def clear():
+    global _total_bytes
+    with _lock:
+        _entries.clear()
+        _total_bytes = 0
+
+
+def search(api_url, username, api_key, query, page=None):
+    """Return ``(data, cache_status)`` for a knowledge search.
+
+    Fresh entries are served locally. Stale entries are revalidated with
+    ``If-None-Match`` using the server ETag or, failing that, a SHA-256 of
+    the cached body; a 304 or an unchanged body only refreshes the entry.
+    Raises ``requests.RequestException`` or ``ValueError`` like a direct call.
+    """
+    key = _cache_key(api_url, username, api_key, query, page)
+    entry = _lookup(key)
+    if entry and time.time() - entry["fetched"] < KNOWLEDGE_TTL:
+        return entry["data"], HIT
+
+    headers = {"Authorization": f"Bearer {api_key}"}
+    if entry and entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+    payload = {"query": query, "user": username}
+    if page is not None:
+        payload["page"] = page
+    res = fura_session.post(
+        api_url,
+        "/knowledge/search",
+        json=payload,
+        headers=headers,
+        timeout=10,
+    )
+    if entry and res.status_code == 304:
+        _touch(key)
+        return entry["data"], REVALIDATED
+    res.raise_for_status()
+    body = res.content
+    etag = res.headers.get("ETag") or _content_hash(body)
+    if entry and etag == entry["etag"]:
+        _touch(key)
+        return entry["data"], REVALIDATED
+    data = json.loads(body)
+    _store(key, data, etag, len(body))
+    return data, MISS
+
+
+def _get_prefetcher():
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="knowledge")
+    return _prefetcher
+
+
+def _prefetch(api_url, username, api_key, query, page):
+    try:
+        search(api_url, username, api_key, query, page)
+    except (requests.RequestException, ValueError):
+        pass
+
+
+def prefetch_next(api_url, username, api_key, query, page):
+    """Warm the cache with ``page + 1`` in the background."""
+    next_key = _cache_key(api_url, username, api_key, query, page + 1)
+    entry = _lookup(next_key)
+    if entry and time.time() - entry["fetched"] < KNOWLEDGE_TTL:
+        return
+    _get_prefetcher().submit(_prefetch, api_url, username, api_key, query, page + 1)
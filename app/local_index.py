@@ -0,0 +1,164 @@
+import hashlib
+import json
+import math
+import os
+import shelve
+import threading
+import time
+from collections import Counter
+
+import auth_cache
+from text_utils import canonicalize_query
+
+LOCAL_INDEX_FILE = os.path.join(os.path.dirname(__file__), "local_index.db")
+LOCAL_INDEX_MAX_DOCS = 5000  # per partition
+LOCAL_TOP_K = 5
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text):
+    return [token for token in canonicalize_query(text).split() if len(token) > 1]
+
+
+def item_text(item):
+    """Return the searchable text of a context item from ``debug["items"]``."""
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        for field in ("text", "content", "snippet", "context"):
+            value = item.get(field)
+            if isinstance(value, str) and value.strip():
+                return value
+    return json.dumps(item, ensure_ascii=False)
+
+
+def partition_key(api_url, username, api_key, remember):
+    """Items are separated per credentials (hashed) and memory mode.
+
+    Including the API key keeps a wrong key from reading another user's
+    items while Fura is unreachable.
+    """
+    mode = "public" if remember else "private"
+    return f"{auth_cache.credential_key(api_url, username, api_key)}:{mode}"
+
+
+class _Partition:
+    """In-memory BM25 postings for one partition."""
+
+    def __init__(self):
+        self.docs = {}
+        self.postings = {}
+        self.total_length = 0
+
+    def add(self, doc_id, doc):
+        if doc_id in self.docs:
+            return
+        self.docs[doc_id] = doc
+        self.total_length += doc["length"]
+        for token, freq in doc["tf"].items():
+            self.postings.setdefault(token, {})[doc_id] = freq
+
+    def remove(self, doc_id):
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        self.total_length -= doc["length"]
+        for token in doc["tf"]:
+            posting = self.postings.get(token)
+            if posting:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[token]
+
+    def search(self, tokens, limit):
+        if not self.docs:
+            return []
+        count = len(self.docs)
+        avg_length = self.total_length / count
+        scores = {}
+        for token in set(tokens):
+            posting = self.postings.get(token)
+            if not posting:
+                continue
+            idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, freq in posting.items():
+                length = self.docs[doc_id]["length"]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (BM25_K1 + 1) / (freq + norm)
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+        return [(score, self.docs[doc_id]["item"]) for doc_id, score in ranked]
+
+
+_partitions = None
+_lock = threading.Lock()
+
+
+def _open_store():
+    return shelve.open(LOCAL_INDEX_FILE)
+
+
+def _load():
+    """Build all partitions from the persistent store on first use."""
+    global _partitions
+    if _partitions is not None:
+        return _partitions
+    partitions = {}
+    with _open_store() as store:
+        for key, doc in store.items():
+            partition, doc_id = key.rsplit("\0", 1)
+            partitions.setdefault(partition, _Partition()).add(doc_id, doc)
+    _partitions = partitions
+    return _partitions
+
+
+def add_items(api_url, username, api_key, remember, items):
+    """Persist context items so they can be searched without Fura."""
+    if not isinstance(items, list) or not items:
+        return
+    partition = partition_key(api_url, username, api_key, remember)
+    now = time.time()
+    with _lock:
+        index = _load().setdefault(partition, _Partition())
+        with _open_store() as store:
+            for item in items:
+                text = item_text(item)
+                tokens = tokenize(text)
+                if not tokens:
+                    continue
+                doc_id = hashlib.sha1(text.encode("utf-8")).hexdigest()
+                if doc_id in index.docs:
+                    continue
+                doc = {"item": item, "tf": dict(Counter(tokens)), "length": len(tokens), "added": now}
+                index.add(doc_id, doc)
+                store[f"{partition}\0{doc_id}"] = doc
+            excess = len(index.docs) - LOCAL_INDEX_MAX_DOCS
+            if excess > 0:
+                oldest = sorted(index.docs, key=lambda d: index.docs[d]["added"])[:excess]
+                for doc_id in oldest:
+                    index.remove(doc_id)
+                    del store[f"{partition}\0{doc_id}"]
+
+
+def search(api_url, username, api_key, remember, query, limit=LOCAL_TOP_K):
+    """Return up to ``limit`` ``(score, item)`` pairs ranked by BM25."""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    with _lock:
+        index = _load().get(partition_key(api_url, username, api_key, remember))
+        if index is None:
+            return []
+        return index.search(tokens, limit)
+
+
+def build_context(query, api_url, username, api_key, remember, limit=LOCAL_TOP_K):
+    """Assemble a ``get_context``-shaped response from local items, or ``None``."""
+    hits = search(api_url, username, api_key, remember, query, limit)
+    if not hits:
+        return None
+    items = [item for _, item in hits]
+    return {
+        "context": "\n".join(item_text(item) for item in items),
+        "debug": {"items": items, "source": "local"},
+    }
@@ -1,16 +1,37 @@
+import startup
 from flask import Flask, request, jsonify
 import subprocess
 import threading
-import webbrowser
+import time
 import json
-import requests
 import logging
-import unicodedata
-from fura_client import get_context
+import urllib.request
+from text_utils import strip_diacritics
+
+startup.mark("import:flask")
+requests = startup.load("requests")
+fura_client = startup.load("fura_client")
+auth_cache = startup.load("auth_cache")
+crawl_jobs = startup.load("crawl_jobs")
+knowledge_cache = startup.load("knowledge_cache")
+
+APP_URL = "http://localhost:8000"
+READY_TIMEOUT = 30
+MODELS_TTL = 60
 
 app = Flask(__name__, static_folder="static", static_url_path="")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+startup.mark("app_created")
+
+_discovered_models = None
+_discovered_at = 0.0
+_discovery_lock = threading.Lock()
+
+
+def _start_background(target):
+    """Run ``target`` in a daemon thread; tests replace this to run inline."""
+    threading.Thread(target=target, daemon=True).start()
 
 
 def fetch_models():
@@ -59,17 +80,6 @@ def fetch_models():
             return []
 
 
-def strip_diacritics(text):
-    """Return text without diacritics for internal comparisons."""
-    if not isinstance(text, str):
-        return text
-    return (
-        unicodedata.normalize("NFD", text)
-        .encode("ascii", "ignore")
-        .decode("ascii")
-    )
-
-
 def choose_model(prompt):
     prompt = strip_diacritics(prompt or "").lower()
     if "program" in prompt or "kod" in prompt:
@@ -92,12 +102,37 @@ def simple():
 
 @app.route("/models", methods=["GET"])
 def models():
+    if _discovered_models:
+        if time.monotonic() - _discovered_at > MODELS_TTL:
+            _start_background(discover_models)
+        return jsonify(_discovered_models)
     return jsonify(fetch_models())
 
 
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """Readiness probe with a startup timing breakdown."""
+    status = startup.report()
+    status["status"] = "ok"
+    status["models_ready"] = _discovered_models is not None
+    return jsonify(status)
+
+
+@app.route("/cache/stats", methods=["GET"])
+def context_cache_stats():
+    return jsonify(fura_client.cache_stats())
+
+
 @app.route("/auth/me", methods=["POST"])
 def auth_me():
     data = request.get_json() or {}
+    token = data.get("session_token") or request.headers.get("X-Session-Token")
+    credentials = auth_cache.resolve_token(token) if token else None
+    if token and not data.get("api_key"):
+        if credentials is None:
+            return _invalid_session_response()
+        data.update(credentials)
+
     api_url = data.get("api_url")
     username = data.get("username")
     api_key = data.get("api_key")
@@ -105,17 +140,59 @@ def auth_me():
     if not api_url or not username or not api_key:
         return jsonify({"error": "Missing api_url, username or api_key"}), 400
 
-    headers = {"Authorization": f"Bearer {api_key}"}
-    params = {"user": username}
-
     try:
-        res = requests.get(f"{api_url}/auth/me", headers=headers, params=params, timeout=10)
-        if res.ok:
-            return jsonify(res.json())
-        return jsonify(res.json()), res.status_code
+        status, result = auth_cache.verify(api_url, username, api_key)
     except requests.RequestException as exc:
         logger.error("Auth check failed: %s", exc)
         return jsonify({"error": "Auth check failed", "details": str(exc)}), 502
+    if status >= 400:
+        return jsonify(result), status
+    if not isinstance(result, dict):
+        result = {"user": result}
+    result = dict(result)
+    verified = {"api_url": api_url, "username": username, "api_key": api_key}
+    if credentials is not None and credentials == verified:
+        result["session_token"] = token
+    else:
+        result["session_token"] = auth_cache.issue_token(api_url, username, api_key)
+    return jsonify(result)
+
+
+@app.route("/auth/logout", methods=["POST"])
+def auth_logout():
+    data = request.get_json() or {}
+    token = data.get("session_token") or request.headers.get("X-Session-Token")
+    if token:
+        auth_cache.revoke_token(token)
+    return jsonify({"ok": True})
+
+
+def _apply_session_token(data):
+    """Fill api_url, username and api_key from a session token if one was sent.
+
+    Returns False when a token was supplied but is unknown or expired.
+    """
+    token = data.get("session_token") or request.headers.get("X-Session-Token")
+    if not token:
+        return True
+    credentials = auth_cache.resolve_token(token)
+    if credentials is None:
+        return False
+    data.update(credentials)
+    return True
+
+
+def _invalid_session_response():
+    return (
+        jsonify(
+            {
+                "error": "Invalid or expired session token",
+                "error_code": 401,
+                "session_expired": True,
+            }
+        ),
+        401,
+    )
 
 def _validate_fura_fields(message, api_url, username, api_key):
     """Ensure required fields for the Fura request are non-empty strings."""
@@ -133,6 +210,8 @@ def _validate_fura_fields(message, api_url, username, api_key):
 @app.route("/ask", methods=["POST"])
 def ask():
     data = request.get_json() or {}
+    if not _apply_session_token(data):
+        return _invalid_session_response()
     message = data.get("message")
     api_url = data.get("api_url")
     username = data.get("username")
@@ -159,7 +238,7 @@ def ask():
     query = message
     logger.info("Received ask request for model %s", requested_model)
 
-    context_data = get_context(query, api_key, username, api_url, remember)
+    context_data = fura_client.get_context(query, api_key, username, api_url, remember)
 
     if "error" in context_data:
         logger.error("Context retrieval failed: %s", context_data.get("error"))
@@ -290,56 +369,81 @@ def ask():
 @app.route("/knowledge", methods=["POST"])
 def knowledge():
     data = request.get_json() or {}
+    if not _apply_session_token(data):
+        return _invalid_session_response()
     query = data.get("query")
     api_url = data.get("api_url")
     username = data.get("username")
     api_key = data.get("api_key")
     if not all([query, api_url, username, api_key]):
         return jsonify({"error": "Missing required fields"}), 400
-    headers = {"Authorization": f"Bearer {api_key}"}
-    payload = {"query": query, "user": username}
+    page = data.get("page")
+    if page is not None and (not isinstance(page, int) or page < 1):
+        return jsonify({"error": "page must be a positive integer"}), 400
     try:
-        res = requests.post(
-            f"{api_url}/knowledge/search",
-            json=payload,
-            headers=headers,
-            timeout=10,
-        )
-        res.raise_for_status()
-        return jsonify(res.json())
+        result, cache_status = knowledge_cache.search(api_url, username, api_key, query, page)
     except requests.RequestException as exc:
         logger.error("Knowledge search failed: %s", exc)
         return jsonify({"error": "Knowledge search failed", "details": str(exc)}), 500
+    except ValueError:
+        return jsonify({"error": "Invalid JSON response"}), 500
+    if page is not None:
+        knowledge_cache.prefetch_next(api_url, username, api_key, query, page)
+    response = jsonify(result)
+    response.headers["X-Cache"] = cache_status
+    return response
 
 
 @app.route("/crawl", methods=["POST"])
 def crawl():
     data = request.get_json() or {}
+    if not _apply_session_token(data):
+        return _invalid_session_response()
     url = data.get("url")
+    urls = data.get("urls")
     api_url = data.get("api_url")
     username = data.get("username")
     api_key = data.get("api_key")
-    if not all([url, api_url, username, api_key]):
+    if not all([url or urls, api_url, username, api_key]):
         return jsonify({"error": "Missing required fields"}), 400
-    headers = {"Authorization": f"Bearer {api_key}"}
-    payload = {"url": url, "user": username}
+    if urls is not None and not isinstance(urls, list):
+        return jsonify({"error": "urls must be a list"}), 400
+    if urls is None and not isinstance(url, str):
+        return jsonify({"error": "url must be a string"}), 400
+    if urls is not None:
+        jobs, rejected = crawl_jobs.submit_many(urls, api_url, username, api_key)
+        if rejected:
+            logger.error("Crawl queue full, rejected %d URL(s)", len(rejected))
+        body = {"jobs": jobs, "rejected": rejected}
+        if rejected and not jobs:
+            body["error"] = "Too many pending crawl jobs"
+            return jsonify(body), 503
+        return jsonify(body), 202
     try:
-        res = requests.post(
-            f"{api_url}/crawl",
-            json=payload,
-            headers=headers,
-            timeout=10,
-        )
-        res.raise_for_status()
-        return jsonify(res.json())
-    except requests.RequestException as exc:
-        logger.error("Crawl failed: %s", exc)
-        return jsonify({"error": "Crawl failed", "details": str(exc)}), 500
+        return jsonify(crawl_jobs.submit(url, api_url, username, api_key)), 202
+    except crawl_jobs.QueueFullError as exc:
+        logger.error("Crawl rejected: %s", exc)
+        return jsonify({"error": "Crawl failed", "details": str(exc)}), 503
+
+
+@app.route("/crawl/<job_id>", methods=["GET"])
+def crawl_status(job_id):
+    data = {"session_token": request.args.get("session_token")}
+    if not _apply_session_token(data):
+        return _invalid_session_response()
+    if not all(data.get(field) for field in ("api_url", "username", "api_key")):
+        return jsonify({"error": "Missing session token"}), 401
+    job = crawl_jobs.get_job(job_id, data["api_url"], data["username"], data["api_key"])
+    if job is None:
+        return jsonify({"error": "Unknown crawl job"}), 404
+    return jsonify(job)
 
 
 @app.route("/code", methods=["POST"])
 def code():
     data = request.get_json() or {}
+    if not _apply_session_token(data):
+        return _invalid_session_response()
 
     source_code = data.get("code")
     instruction = data.get("instruction")
@@ -382,9 +486,9 @@ def code():
         )
 
     if api_url:
-        context_data = get_context(instruction, api_key, username, api_url, remember)
+        context_data = fura_client.get_context(instruction, api_key, username, api_url, remember)
     else:
-        context_data = get_context(instruction, api_key, username, remember=remember)
+        context_data = fura_client.get_context(instruction, api_key, username, remember=remember)
 
     if "error" in context_data:
         logger.error("Context retrieval failed: %s", context_data.get("error"))
@@ -524,6 +628,54 @@ def code():
             500,
         )
 
+def discover_models():
+    """Fetch the model list in the background so /models can answer at once.
+
+    /models serves the list and refreshes it here once it is older than
+    ``MODELS_TTL`` seconds, so newly pulled models show up.
+    """
+    global _discovered_models, _discovered_at
+    if not _discovery_lock.acquire(blocking=False):
+        return
+    try:
+        first = _discovered_models is None
+        start = time.perf_counter()
+        _discovered_models = fetch_models()
+        _discovered_at = time.monotonic()
+        if first:
+            startup.record("model_discovery", time.perf_counter() - start)
+    finally:
+        _discovery_lock.release()
+
+
+def wait_until_ready(url=APP_URL, timeout=READY_TIMEOUT):
+    """Poll /healthz until the server answers; return False on timeout."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/healthz", timeout=1) as res:
+                if res.status == 200:
+                    startup.mark("ready")
+                    return True
+        except OSError:
+            pass
+        time.sleep(0.05)
+    return False
+
+
+def _after_start():
+    if wait_until_ready():
+        import webbrowser
+
+        webbrowser.open(APP_URL)
+    else:
+        logger.error("Server did not become ready within %s seconds", READY_TIMEOUT)
+    if startup.FAST_START:
+        startup.warm_up()
+        discover_models()
+    logger.info("Startup timings (ms): %s", startup.report()["timings_ms"])
+
+
 if __name__ == "__main__":
-    threading.Timer(1.0, lambda: webbrowser.open("http://localhost:8000")).start()
+    _start_background(_after_start)
     app.run(port=8000)
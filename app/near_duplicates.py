@@ -0,0 +1,98 @@
+import hashlib
+import random
+import struct
+import threading
+
+NUM_PERMUTATIONS = 32
+BANDS = 8
+SHINGLE_SIZE = 3
+_PRIME = (1 << 61) - 1
+
+_rng = random.Random(0x4A415256)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Return the set of character n-grams of ``text`` (padded with spaces)."""
+    padded = f" {text} "
+    if len(padded) <= size:
+        return {padded}
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def minhash(shingle_set):
+    hashes = [
+        struct.unpack("<Q", hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest())[0]
+        for s in shingle_set
+    ]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index returning the most similar stored key above a threshold.
+
+    Candidates from matching LSH bands are confirmed with the exact Jaccard
+    similarity of their shingle sets.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.rows = NUM_PERMUTATIONS // BANDS
+        self._shingles = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        return key in self._shingles
+
+    def __len__(self):
+        return len(self._shingles)
+
+    def _bands(self, signature):
+        for band in range(BANDS):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def add(self, key):
+        with self._lock:
+            if key in self._shingles:
+                return
+            shingle_set = shingles(key)
+            self._shingles[key] = shingle_set
+            for band in self._bands(minhash(shingle_set)):
+                self._buckets.setdefault(band, set()).add(key)
+
+    def remove(self, key):
+        with self._lock:
+            shingle_set = self._shingles.pop(key, None)
+            if shingle_set is None:
+                return
+            for band in self._bands(minhash(shingle_set)):
+                bucket = self._buckets.get(band)
+                if bucket:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._buckets[band]
+
+    def lookup(self, key):
+        """Return ``(match, similarity)`` for the best stored key, or ``(None, 0.0)``."""
+        query_shingles = shingles(key)
+        with self._lock:
+            candidates = set()
+            for band in self._bands(minhash(query_shingles)):
+                candidates |= self._buckets.get(band, set())
+            best, best_score = None, 0.0
+            for candidate in candidates:
+                score = jaccard(query_shingles, self._shingles[candidate])
+                if score > best_score:
+                    best, best_score = candidate, score
+        if best is None or best_score < self.threshold:
+            return None, 0.0
+        return best, best_score
@@ -0,0 +1,81 @@
+import importlib
+import os
+import sys
+import threading
+import time
+
+STARTED = time.perf_counter()
+FAST_START = (
+    os.environ.get("JARVIK_FAST_START", "").lower() in {"1", "true", "yes"}
+    or "--fast-start" in sys.argv
+)
+
+_timings = {}
+_lazy_modules = []
+_import_lock = threading.Lock()
+_warm = threading.Event()
+
+
+def record(name, seconds):
+    _timings[name] = round(seconds * 1000, 1)
+
+
+def mark(name):
+    """Record the milliseconds elapsed since this module was imported."""
+    record(name, time.perf_counter() - STARTED)
+
+
+class LazyModule:
+    """Module proxy that performs the import on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            with _import_lock:
+                if self._module is None:
+                    self._module = _timed_import(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+def _timed_import(name):
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    record(f"import:{name}", time.perf_counter() - start)
+    return module
+
+
+def load(name):
+    """Import ``name`` now, or return a lazy proxy in fast-start mode."""
+    if FAST_START:
+        module = LazyModule(name)
+        _lazy_modules.append(module)
+        return module
+    return _timed_import(name)
+
+
+def warm_up():
+    """Resolve all deferred imports, typically once the server is listening."""
+    start = time.perf_counter()
+    for module in _lazy_modules:
+        module._load()
+    record("warm_up", time.perf_counter() - start)
+    _warm.set()
+
+
+def is_warm():
+    return not FAST_START or _warm.is_set()
+
+
+def report():
+    return {
+        "fast_start": FAST_START,
+        "warm": is_warm(),
+        "uptime": round(time.perf_counter() - STARTED, 3),
+        "timings_ms": dict(_timings),
+    }
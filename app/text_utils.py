@@ -0,0 +1,53 @@
+import re
+import unicodedata
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def strip_diacritics(text):
+    """Return text without diacritics for internal comparisons."""
+    if not isinstance(text, str):
+        return text
+    return (
+        unicodedata.normalize("NFD", text)
+        .encode("ascii", "ignore")
+        .decode("ascii")
+    )
+
+
+def canonicalize_query(text):
+    """Normalize a query for cache lookups.
+
+    Diacritics and case are dropped, punctuation becomes whitespace and runs
+    of whitespace collapse, so "Co je smlouva o dílo?" and
+    "co je  smlouva o dilo" map to the same key.
+    """
+    text = strip_diacritics(text or "").casefold()
+    text = _NON_WORD.sub(" ", text).replace("_", " ")
+    return " ".join(text.split())
+
+
+NEGATIONS = frozenset({"ne", "nic", "nikdy", "bez", "no", "not", "never", "without"})
+
+
+def is_wording_variant(a, b):
+    """Return True if canonical queries ``a`` and ``b`` differ only by added words.
+
+    The shorter query's words must appear in the longer one in the same
+    order and the extra words may not be numbers or negations, so
+    "co je smlouva" matches "co je to smlouva" while "produkt 12" and
+    "produkt 13", "austria" and "australia" or swapped words do not.
+    """
+    short, long = sorted((a.split(), b.split()), key=len)
+    extra = []
+    matched = 0
+    for token in long:
+        if matched < len(short) and token == short[matched]:
+            matched += 1
+        else:
+            extra.append(token)
+    if matched < len(short):
+        return False
+    return not any(
+        token in NEGATIONS or any(char.isdigit() for char in token) for token in extra
+    )
@@ -0,0 +1,3 @@
+import os
+
+os.environ.setdefault("JARVIK_FAST_START", "1")
@@ -0,0 +1,80 @@
+import json
+import pathlib
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "app"))
+
+import fura_session  # noqa: E402
+
+
+class FakeResponse:
+    """Minimal stand-in for ``requests.Response``."""
+
+    def __init__(self, status_code=200, data=None, etag=None):
+        self.status_code = status_code
+        self._data = data
+        self.content = json.dumps(data).encode("utf-8") if data is not None else b""
+        self.text = self.content.decode("utf-8")
+        self.headers = {"ETag": etag} if etag else {}
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        if self._data is None:
+            raise ValueError("No JSON body")
+        return self._data
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} error", response=self)
+
+
+class FakeFura:
+    """Replaces ``fura_session.get``/``post`` and records every call.
+
+    Responses are served from ``add()`` in order, or built by ``responder``
+    (a callable taking the recorded call) when one is set.
+    """
+
+    Response = FakeResponse
+
+    def __init__(self):
+        self.calls = []
+        self.responses = []
+        self.responder = None
+
+    def add(self, status_code=200, data=None, etag=None):
+        self.responses.append(FakeResponse(status_code, data, etag))
+        return self
+
+    def _handle(self, method, api_url, path, json=None, headers=None, **kwargs):
+        call = {
+            "method": method,
+            "api_url": api_url,
+            "path": path,
+            "json": json,
+            "headers": dict(headers or {}),
+        }
+        self.calls.append(call)
+        if self.responder is not None:
+            return self.responder(call)
+        return self.responses.pop(0)
+
+    def get(self, api_url, path, **kwargs):
+        return self._handle("GET", api_url, path, **kwargs)
+
+    def post(self, api_url, path, **kwargs):
+        return self._handle("POST", api_url, path, **kwargs)
+
+
+@pytest.fixture
+def fake_fura(monkeypatch):
+    fake = FakeFura()
+    monkeypatch.setattr(fura_session, "get", fake.get)
+    monkeypatch.setattr(fura_session, "post", fake.post)
+    return fake
@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+import auth_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_auth(monkeypatch):
+    monkeypatch.setattr(auth_cache, "_verified", {})
+    monkeypatch.setattr(auth_cache, "_sessions", {})
+
+
+def test_verify_caches_success(fake_fura):
+    fake_fura.add(200, {"user": "bob"})
+    assert auth_cache.verify("https://fura", "bob", "key") == (200, {"user": "bob"})
+    assert auth_cache.verify("https://fura", "bob", "key") == (200, {"user": "bob"})
+    assert len(fake_fura.calls) == 1
+
+
+def test_verify_negative_cache_expires(fake_fura):
+    fake_fura.add(401, {"error": "bad key"}).add(200, {"user": "bob"})
+    assert auth_cache.verify("https://fura", "bob", "bad")[0] == 401
+    assert auth_cache.verify("https://fura", "bob", "bad")[0] == 401
+    assert len(fake_fura.calls) == 1
+    key = auth_cache.credential_key("https://fura", "bob", "bad")
+    auth_cache._verified[key]["expires"] = time.time() - 1
+    assert auth_cache.verify("https://fura", "bob", "bad")[0] == 200
+    assert len(fake_fura.calls) == 2
+
+
+def test_session_token_roundtrip():
+    token = auth_cache.issue_token("https://fura", "bob", "key")
+    assert auth_cache.resolve_token(token) == {
+        "api_url": "https://fura",
+        "username": "bob",
+        "api_key": "key",
+    }
+    auth_cache.revoke_token(token)
+    assert auth_cache.resolve_token(token) is None
+
+
+def test_session_token_is_stored_hashed():
+    token = auth_cache.issue_token("https://fura", "bob", "key")
+    assert token not in auth_cache._sessions
+    assert auth_cache._token_key(token) in auth_cache._sessions
+
+
+def test_expired_verification_is_pruned(monkeypatch, fake_fura):
+    monkeypatch.setattr(auth_cache, "_verified", {"old": {"expires": time.time() - 1}})
+    fake_fura.add(200, {"user": "bob"})
+    auth_cache.verify("https://fura", "bob", "key")
+    assert "old" not in auth_cache._verified
+
+
+def test_expired_session_token(monkeypatch):
+    monkeypatch.setattr(auth_cache, "SESSION_TTL", -1)
+    token = auth_cache.issue_token("https://fura", "bob", "key")
+    assert auth_cache.resolve_token(token) is None
+
+
+def test_auth_me_replaces_unresolved_token(fake_fura):
+    import main
+
+    fake_fura.add(200, {"user": "bob"})
+    client = main.app.test_client()
+    payload = {"api_url": "https://fura", "username": "bob", "api_key": "key"}
+    res = client.post("/auth/me", json={**payload, "session_token": "garbage"})
+    token = res.get_json()["session_token"]
+    assert token != "garbage"
+    assert auth_cache.resolve_token(token) == payload
+    res = client.post("/auth/me", json={**payload, "session_token": token})
+    assert res.get_json()["session_token"] == token
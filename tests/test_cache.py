@@ -1,3 +1,4 @@
+import threading
 import time
 import importlib.util
 import pathlib
@@ -32,3 +33,187 @@ def test_cache_eviction(tmp_path, monkeypatch):
         assert "a" not in cache
         assert len(cache) == 2
 
+
+def test_cache_byte_budget(tmp_path, monkeypatch):
+    cache_path = tmp_path / "cache.db"
+    monkeypatch.setattr(fura_client, "CACHE_FILE", str(cache_path))
+    monkeypatch.setattr(fura_client, "CACHE_MAX_BYTES", 250)
+    now = time.time()
+    with fura_client._open_cache() as cache:
+        cache["a"] = {"timestamp": now - 3, "size": 100}
+        cache["b"] = {"timestamp": now - 2, "last_access": now, "size": 100}
+        cache["c"] = {"timestamp": now - 1, "size": 100}
+        fura_client._prune_cache(cache)
+        assert sorted(cache) == ["b", "c"]
+
+
+def test_payload_is_compressed():
+    data = {"context": "smlouva o dílo " * 200, "debug": {"items": []}}
+    entry = fura_client._pack(data, time.time())
+    assert entry["size"] < len(str(data))
+    assert fura_client._unpack(entry) == data
+
+
+def test_admission_rejects_one_off_query(tmp_path, monkeypatch):
+    cache_path = tmp_path / "cache.db"
+    monkeypatch.setattr(fura_client, "CACHE_FILE", str(cache_path))
+    monkeypatch.setattr(fura_client, "CACHE_MAX_ITEMS", 1)
+    monkeypatch.setattr(fura_client, "_sketch", fura_client.FrequencySketch(width=64))
+    now = time.time()
+    for _ in range(3):
+        fura_client._sketch.increment("hot")
+    fura_client._sketch.increment("cold")
+    with fura_client._open_cache() as cache:
+        assert fura_client._store(cache, "hot", {"x": 1}, now)
+        assert not fura_client._store(cache, "cold", {"x": 2}, now)
+        assert list(cache) == ["hot"]
+        for _ in range(5):
+            fura_client._sketch.increment("cold")
+        assert fura_client._store(cache, "cold", {"x": 2}, now)
+        assert list(cache) == ["cold"]
+
+
+class NoScanCache(dict):
+    def values(self):
+        raise AssertionError("cache values scanned")
+
+    def items(self):
+        raise AssertionError("cache items scanned")
+
+
+def test_store_uses_metadata_instead_of_scanning(tmp_path, monkeypatch):
+    monkeypatch.setattr(fura_client, "CACHE_MAX_ITEMS", 2)
+    monkeypatch.setattr(fura_client, "_meta", {})
+    monkeypatch.setattr(fura_client, "_meta_bytes", 0)
+    monkeypatch.setattr(fura_client, "_meta_file", fura_client.CACHE_FILE)
+    monkeypatch.setattr(fura_client, "_sketch", fura_client.FrequencySketch(width=64))
+    for _ in range(2):
+        fura_client._sketch.increment("c")
+    cache = NoScanCache()
+    now = time.time()
+    for offset, key in enumerate(("a", "b", "c")):
+        assert fura_client._store(cache, key, {"key": key}, now + offset)
+    assert sorted(cache) == ["b", "c"]
+    assert fura_client._meta_bytes == sum(entry["size"] for entry in dict.values(cache))
+
+
+def _isolate(tmp_path, monkeypatch):
+    monkeypatch.setattr(fura_client, "CACHE_FILE", str(tmp_path / "cache.db"))
+    monkeypatch.setattr(fura_client, "_indexes", None)
+    monkeypatch.setattr(fura_client.local_index, "LOCAL_INDEX_FILE", str(tmp_path / "index.db"))
+    monkeypatch.setattr(fura_client.local_index, "_partitions", None)
+
+
+def _offline(*args, **kwargs):
+    raise fura_client.requests.ConnectionError("offline")
+
+
+def _seed(query, data, username="bob", timestamp=None):
+    key = fura_client.cache_key(query, fura_client.API_URL, username, "key", False)
+    with fura_client._open_cache() as cache:
+        fura_client._store(cache, key, data, timestamp or time.time())
+
+
+def test_only_recent_exact_hits_skip_network(tmp_path, monkeypatch, fake_fura):
+    _isolate(tmp_path, monkeypatch)
+    monkeypatch.setattr(fura_client, "NEAR_DUPLICATE_THRESHOLD", 0.7)
+    fake_fura.add(200, {"context": "dilo"}).add(200, {"context": "to dilo"})
+    assert fura_client.get_context("Co je smlouva?", "key", "bob") == {"context": "dilo"}
+    assert fura_client.get_context("co je smlouva", "key", "bob") == {"context": "dilo"}
+    assert fura_client.get_context("co je to smlouva", "key", "bob") == {"context": "to dilo"}
+    assert len(fake_fura.calls) == 2
+
+
+def test_hits_expire_after_serve_ttl(tmp_path, monkeypatch, fake_fura):
+    _isolate(tmp_path, monkeypatch)
+    _seed("co je smlouva", {"context": "old"}, timestamp=time.time() - fura_client.SERVE_TTL - 1)
+    fake_fura.add(200, {"context": "new"})
+    assert fura_client.get_context("co je smlouva", "key", "bob") == {"context": "new"}
+    assert len(fake_fura.calls) == 1
+
+
+def test_remember_requests_always_reach_fura(tmp_path, monkeypatch, fake_fura):
+    _isolate(tmp_path, monkeypatch)
+    fake_fura.add(200, {"context": "a"}).add(200, {"context": "b"})
+    assert fura_client.get_context("zapamatuj si", "key", "bob", remember=True) == {"context": "a"}
+    assert fura_client.get_context("zapamatuj si", "key", "bob", remember=True) == {"context": "b"}
+    assert len(fake_fura.calls) == 2
+
+
+def test_cached_context_is_partitioned(tmp_path, monkeypatch, fake_fura):
+    _isolate(tmp_path, monkeypatch)
+    _seed("co je smlouva o dilo", {"context": "bob"})
+    fake_fura.add(200, {"context": "alice"}).add(200, {"context": "public"})
+    assert fura_client.get_context("co je smlouva o dilo", "key", "alice") == {"context": "alice"}
+    result = fura_client.get_context("co je smlouva o dilo", "key", "bob", remember=True)
+    assert result == {"context": "public"}
+    assert len(fake_fura.calls) == 2
+
+
+def test_concurrent_hits_are_all_counted(tmp_path, monkeypatch):
+    _isolate(tmp_path, monkeypatch)
+    monkeypatch.setattr(fura_client, "_stats", dict.fromkeys(fura_client._stats, 0))
+    _seed("co je smlouva o dilo", {"context": "dilo"})
+
+    def worker():
+        for _ in range(25):
+            assert fura_client.get_context("co je smlouva o dilo", "key", "bob") == {"context": "dilo"}
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert fura_client.cache_stats()["hits"] == 200
+
+
+def test_get_context_falls_back_to_stale_near_duplicate(tmp_path, monkeypatch):
+    _isolate(tmp_path, monkeypatch)
+    monkeypatch.setattr(fura_client, "NEAR_DUPLICATE_THRESHOLD", 0.7)
+    monkeypatch.setattr(fura_client.fura_session, "post", _offline)
+    stale = time.time() - fura_client.CACHE_TTL - 1
+    _seed("co je smlouva o dilo", {"context": "dilo"}, timestamp=stale)
+    assert fura_client.get_context("Co je smlouva o dílo?", "key", "bob") == {"context": "dilo"}
+    assert fura_client.get_context("co je to smlouva o dilo", "key", "bob") == {"context": "dilo"}
+
+
+def test_fallback_ignores_near_duplicate_with_other_number(tmp_path, monkeypatch):
+    _isolate(tmp_path, monkeypatch)
+    monkeypatch.setattr(fura_client, "NEAR_DUPLICATE_THRESHOLD", 0.7)
+    monkeypatch.setattr(fura_client.fura_session, "post", _offline)
+    _seed("cena produkt 12", {"context": "12"})
+    assert "error" in fura_client.get_context("cena produkt 13", "key", "bob")
+
+
+def test_get_context_falls_back_to_local_index(tmp_path, monkeypatch):
+    _isolate(tmp_path, monkeypatch)
+    fura_client.local_index.add_items(
+        fura_client.API_URL, "bob", "key", False, [{"text": "Zhotovitel provede dílo."}]
+    )
+    monkeypatch.setattr(fura_client.fura_session, "post", _offline)
+    result = fura_client.get_context("kdo provede dilo", "key", "bob")
+    assert result["context"] == "Zhotovitel provede dílo."
+    assert result["debug"]["source"] == "local"
+
+
+def test_wrong_key_gets_no_fallback(tmp_path, monkeypatch, fake_fura):
+    _isolate(tmp_path, monkeypatch)
+    old = time.time() - fura_client.SERVE_TTL - 1
+    _seed("co je smlouva o dilo", {"context": "cache"}, timestamp=old)
+    fura_client.local_index.add_items(
+        fura_client.API_URL, "bob", "key", False, [{"text": "Zhotovitel provede dílo."}]
+    )
+    fake_fura.add(401, {"error": "Unauthorized"}).add(403, {"error": "Forbidden"})
+    assert "error" in fura_client.get_context("co je smlouva o dilo", "wrong", "bob")
+    assert "error" in fura_client.get_context("co je smlouva o dilo", "key", "bob")
+    monkeypatch.setattr(fura_client.fura_session, "post", _offline)
+    assert "error" in fura_client.get_context("co je smlouva o dilo", "wrong", "bob")
+    assert "error" in fura_client.get_context("kdo provede dilo", "wrong", "bob")
+
+
+def test_server_error_falls_back_to_cache(tmp_path, monkeypatch, fake_fura):
+    _isolate(tmp_path, monkeypatch)
+    old = time.time() - fura_client.SERVE_TTL - 1
+    _seed("co je smlouva o dilo", {"context": "cache"}, timestamp=old)
+    fake_fura.add(503, {"error": "Unavailable"})
+    assert fura_client.get_context("co je smlouva o dilo", "key", "bob") == {"context": "cache"}
@@ -0,0 +1,107 @@
+import pytest
+
+import auth_cache
+import crawl_jobs
+
+
+class InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class IdleExecutor:
+    def submit(self, fn, *args):
+        pass
+
+
+@pytest.fixture
+def crawler(monkeypatch, fake_fura):
+    monkeypatch.setattr(crawl_jobs, "_jobs", {})
+    monkeypatch.setattr(crawl_jobs, "_by_url", {})
+    monkeypatch.setattr(crawl_jobs, "_executor", InlineExecutor())
+    fake_fura.responder = lambda call: fake_fura.Response(
+        200, {"result": f"crawled {call['json']['url']}"}
+    )
+    return fake_fura
+
+
+def _crawled(fake):
+    return [call["json"]["url"] for call in fake.calls]
+
+
+def test_job_runs_and_hides_credentials(crawler):
+    job = crawl_jobs.submit("https://a.example", "https://fura", "bob", "key")
+    status = crawl_jobs.get_job(job["id"], "https://fura", "bob", "key")
+    assert status["status"] == crawl_jobs.DONE
+    assert status["result"] == {"result": "crawled https://a.example"}
+    assert "_credentials" not in status
+
+
+def test_duplicate_urls_are_deduplicated(crawler):
+    jobs, rejected = crawl_jobs.submit_many(
+        ["https://a.example", "https://b.example", "https://a.example", ""],
+        "https://fura",
+        "bob",
+        "key",
+    )
+    again = crawl_jobs.submit("https://a.example", "https://fura", "bob", "key")
+    assert len(jobs) == 2
+    assert rejected == []
+    assert again["id"] == jobs[0]["id"]
+    assert _crawled(crawler) == ["https://a.example", "https://b.example"]
+
+
+def test_queue_limit(monkeypatch, crawler):
+    monkeypatch.setattr(crawl_jobs, "_executor", IdleExecutor())
+    monkeypatch.setattr(crawl_jobs, "MAX_PENDING_JOBS", 1)
+    crawl_jobs.submit("https://a.example", "https://fura", "bob", "key")
+    with pytest.raises(crawl_jobs.QueueFullError):
+        crawl_jobs.submit("https://b.example", "https://fura", "bob", "key")
+
+
+def test_full_queue_returns_accepted_and_rejected(monkeypatch, crawler):
+    monkeypatch.setattr(crawl_jobs, "_executor", IdleExecutor())
+    monkeypatch.setattr(crawl_jobs, "MAX_PENDING_JOBS", 1)
+    jobs, rejected = crawl_jobs.submit_many(
+        ["https://a.example", "https://b.example"], "https://fura", "bob", "key"
+    )
+    assert [job["url"] for job in jobs] == ["https://a.example"]
+    assert rejected == ["https://b.example"]
+
+
+def test_dedup_is_per_credential(crawler):
+    first = crawl_jobs.submit("https://a.example", "https://fura", "bob", "key")
+    other = crawl_jobs.submit("https://a.example", "https://fura", "bob", "other-key")
+    assert first["id"] != other["id"]
+    assert len(crawler.calls) == 2
+
+
+def test_crawl_endpoint_rejects_non_string_url():
+    import main
+
+    res = main.app.test_client().post(
+        "/crawl",
+        json={"url": 123, "api_url": "https://fura", "username": "bob", "api_key": "key"},
+    )
+    assert res.status_code == 400
+
+
+def test_job_is_hidden_from_other_credentials(crawler):
+    job = crawl_jobs.submit("https://a.example", "https://fura", "bob", "key")
+    assert crawl_jobs.get_job(job["id"], "https://fura", "bob", "other-key") is None
+    assert crawl_jobs.get_job(job["id"], "https://fura", "alice", "key") is None
+
+
+def test_crawl_status_requires_owner_session(monkeypatch, crawler):
+    import main
+
+    monkeypatch.setattr(auth_cache, "_sessions", {})
+    job = crawl_jobs.submit("https://a.example", "https://fura", "bob", "key")
+    owner = auth_cache.issue_token("https://fura", "bob", "key")
+    other = auth_cache.issue_token("https://fura", "bob", "other-key")
+    client = main.app.test_client()
+    assert client.get(f"/crawl/{job['id']}").status_code == 401
+    assert client.get(f"/crawl/{job['id']}", headers={"X-Session-Token": other}).status_code == 404
+    res = client.get(f"/crawl/{job['id']}", headers={"X-Session-Token": owner})
+    assert res.status_code == 200
+    assert res.get_json()["result"] == {"result": "crawled https://a.example"}
@@ -0,0 +1,43 @@
+import gzip
+import json
+
+import fura_session
+
+
+def test_session_reused_per_api_url():
+    fura_session.close_sessions()
+    first = fura_session.get_session("https://example.com/")
+    second = fura_session.get_session("https://example.com")
+    other = fura_session.get_session("https://other.example.com")
+    assert first is second
+    assert first is not other
+    fura_session.close_sessions()
+
+
+def test_retry_policy_per_method():
+    fura_session.close_sessions()
+    get_retry = fura_session.get_session("https://example.com").get_adapter("https://x").max_retries
+    post_retry = fura_session.get_session(
+        "https://example.com", idempotent=False
+    ).get_adapter("https://x").max_retries
+    assert get_retry.total == fura_session.MAX_RETRIES
+    assert "POST" not in get_retry.allowed_methods
+    assert post_retry.total == 0
+    assert post_retry.connect == 0
+    assert not post_retry.is_retry("POST", 503)
+    fura_session.close_sessions()
+
+
+def test_large_body_is_gzipped_when_enabled():
+    headers = {}
+    payload = {"query": "x" * 4096}
+    body = fura_session._encode_json(payload, headers, compress=True)
+    assert headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(body)) == payload
+
+
+def test_small_body_is_not_gzipped():
+    headers = {}
+    body = fura_session._encode_json({"query": "x"}, headers, compress=True)
+    assert "Content-Encoding" not in headers
+    assert json.loads(body) == {"query": "x"}
@@ -0,0 +1,46 @@
+import pytest
+
+import knowledge_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    knowledge_cache.clear()
+    yield
+    knowledge_cache.clear()
+
+
+def test_fresh_entry_is_served_from_cache(fake_fura):
+    fake_fura.add(200, {"result": "a"})
+    args = ("https://fura", "bob", "key", "smlouva")
+    assert knowledge_cache.search(*args) == ({"result": "a"}, knowledge_cache.MISS)
+    assert knowledge_cache.search(*args) == ({"result": "a"}, knowledge_cache.HIT)
+    assert len(fake_fura.calls) == 1
+
+
+def test_stale_entry_revalidates_with_etag(monkeypatch, fake_fura):
+    fake_fura.add(200, {"result": "a"}, etag='"v1"').add(304)
+    monkeypatch.setattr(knowledge_cache, "KNOWLEDGE_TTL", 0)
+    args = ("https://fura", "bob", "key", "smlouva")
+    knowledge_cache.search(*args)
+    assert knowledge_cache.search(*args) == ({"result": "a"}, knowledge_cache.REVALIDATED)
+    assert fake_fura.calls[1]["headers"]["If-None-Match"] == '"v1"'
+
+
+def test_byte_budget_evicts_least_recent(monkeypatch, fake_fura):
+    for _ in range(3):
+        fake_fura.add(200, {"result": "x" * 40})
+    monkeypatch.setattr(knowledge_cache, "KNOWLEDGE_MAX_BYTES", 120)
+    for query in ("a", "b", "c"):
+        knowledge_cache.search("https://fura", "bob", "key", query)
+    evicted = knowledge_cache._cache_key("https://fura", "bob", "key", "a", None)
+    assert evicted not in knowledge_cache._entries
+    assert knowledge_cache._total_bytes <= 120
+
+
+def test_other_credential_does_not_hit(fake_fura):
+    fake_fura.add(200, {"result": "a"}).add(200, {"result": "b"})
+    knowledge_cache.search("https://fura", "bob", "key", "smlouva")
+    result = knowledge_cache.search("https://fura", "bob", "WRONGKEY", "smlouva")
+    assert result == ({"result": "b"}, knowledge_cache.MISS)
+    assert len(fake_fura.calls) == 2
@@ -0,0 +1,40 @@
+import local_index
+
+
+def _setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_index, "LOCAL_INDEX_FILE", str(tmp_path / "index.db"))
+    monkeypatch.setattr(local_index, "_partitions", None)
+
+
+def test_search_ranks_matching_items(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    items = [
+        {"text": "Smlouva o dílo upravuje zhotovení věci."},
+        {"text": "Python je programovací jazyk."},
+        "Kupní smlouva převádí vlastnictví.",
+    ]
+    local_index.add_items("https://fura", "bob", "key", False, items)
+    hits = local_index.search("https://fura", "bob", "key", False, "smlouva o dilo")
+    assert [item for _, item in hits][:2] == [items[0], items[2]]
+
+
+def test_partitions_are_separate_and_persistent(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    local_index.add_items("https://fura", "bob", "key", False, ["soukroma poznamka o smlouve"])
+    assert local_index.search("https://fura", "bob", "key", True, "smlouve") == []
+    assert local_index.search("https://fura", "alice", "key", False, "smlouve") == []
+    assert local_index.search("https://fura", "bob", "wrong", False, "smlouve") == []
+    monkeypatch.setattr(local_index, "_partitions", None)
+    context = local_index.build_context("smlouve", "https://fura", "bob", "key", False)
+    assert context["context"] == "soukroma poznamka o smlouve"
+    assert context["debug"]["source"] == "local"
+
+
+def test_partition_size_is_bounded(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch)
+    monkeypatch.setattr(local_index, "LOCAL_INDEX_MAX_DOCS", 2)
+    for text in ("prvni smlouva", "druha smlouva", "treti smlouva"):
+        local_index.add_items("https://fura", "bob", "key", False, [text])
+    monkeypatch.setattr(local_index, "_partitions", None)
+    hits = local_index.search("https://fura", "bob", "key", False, "smlouva")
+    assert sorted(item for _, item in hits) == ["druha smlouva", "treti smlouva"]
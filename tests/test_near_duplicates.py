@@ -0,0 +1,36 @@
+from near_duplicates import NearDuplicateIndex
+from text_utils import canonicalize_query, is_wording_variant
+
+
+def test_canonicalize_query():
+    assert canonicalize_query("Co je smlouva o dílo?") == "co je smlouva o dilo"
+    assert canonicalize_query("  co je   SMLOUVA, o dilo ") == "co je smlouva o dilo"
+    assert canonicalize_query("") == ""
+
+
+def test_is_wording_variant():
+    assert is_wording_variant("co je smlouva o dilo", "co je to smlouva o dilo")
+    assert not is_wording_variant("hlavni mesto austria", "hlavni mesto australia")
+    assert not is_wording_variant("cena produkt 12", "cena produkt 13")
+    assert not is_wording_variant("dane 2024", "dane za rok 2024 2025")
+    assert not is_wording_variant("celsius na fahrenheit", "fahrenheit na celsius")
+    assert not is_wording_variant("jak smazat soubor", "jak nesmazat soubor")
+    assert not is_wording_variant("delete file", "do not delete file")
+
+
+def test_index_finds_near_duplicate():
+    index = NearDuplicateIndex(0.7)
+    index.add("co je smlouva o dilo")
+    index.add("jak napsat program v pythonu")
+    match, score = index.lookup("co je to smlouva o dilo")
+    assert match == "co je smlouva o dilo"
+    assert score >= 0.7
+
+
+def test_index_respects_threshold_and_removal():
+    index = NearDuplicateIndex(0.9)
+    index.add("co je smlouva o dilo")
+    assert index.lookup("kupni smlouva na auto") == (None, 0.0)
+    index.remove("co je smlouva o dilo")
+    assert index.lookup("co je smlouva o dilo") == (None, 0.0)
+    assert len(index) == 0
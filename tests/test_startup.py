@@ -0,0 +1,54 @@
+import sys
+
+import startup
+
+
+def test_lazy_module_imports_on_first_use(monkeypatch):
+    monkeypatch.setattr(startup, "FAST_START", True)
+    monkeypatch.setattr(startup, "_lazy_modules", [])
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    module = startup.load("colorsys")
+    assert "colorsys" not in sys.modules
+    assert module.rgb_to_hsv(0, 0, 0) == (0, 0, 0)
+    assert "colorsys" in sys.modules
+    assert "import:colorsys" in startup.report()["timings_ms"]
+
+
+def test_warm_up_resolves_pending_imports(monkeypatch):
+    monkeypatch.setattr(startup, "FAST_START", True)
+    monkeypatch.setattr(startup, "_lazy_modules", [])
+    monkeypatch.setattr(startup, "_warm", startup.threading.Event())
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    startup.load("colorsys")
+    assert not startup.is_warm()
+    startup.warm_up()
+    assert startup.is_warm()
+    assert "colorsys" in sys.modules
+
+
+def test_models_refresh_after_ttl(monkeypatch):
+    import main
+
+    lists = [["phi3"], ["phi3", "llama3"]]
+    monkeypatch.setattr(main, "fetch_models", lambda: lists.pop(0))
+    monkeypatch.setattr(main, "_discovered_models", None)
+    monkeypatch.setattr(main, "_start_background", lambda target: target())
+    main.discover_models()
+    client = main.app.test_client()
+    assert client.get("/models").get_json() == ["phi3"]
+    monkeypatch.setattr(main, "_discovered_at", main.time.monotonic() - main.MODELS_TTL - 1)
+    client.get("/models")
+    assert client.get("/models").get_json() == ["phi3", "llama3"]
+
+
+def test_healthz_reports_startup(monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "_discovered_models", ["phi3"])
+    res = main.app.test_client().get("/healthz")
+    assert res.status_code == 200
+    status = res.get_json()
+    assert status["status"] == "ok"
+    assert status["models_ready"] is True
+    assert isinstance(status["warm"], bool)
+    assert "app_created" in status["timings_ms"]